@@ -1,38 +1,158 @@
 import os
 import sys
-import json
 import re
+import shutil
+import socket
+import stat
+import threading
+import time
+import traceback
+from functools import lru_cache
+from concurrent.futures import ThreadPoolExecutor
 from urllib.parse import urlparse, urljoin
+import orjson
+import requests
+from requests.adapters import HTTPAdapter
+from selectolax.lexbor import LexborHTMLParser
 from selenium import webdriver
+from selenium.common.exceptions import (
+    NoSuchElementException,
+    StaleElementReferenceException,
+    TimeoutException,
+)
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from yt_dlp import YoutubeDL  # type: ignore
 
+USER_AGENT = (
+    "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 "
+    "(KHTML, like Gecko) Chrome/138.0.0.0 Safari/537.36"
+)
+
+# Reused across runs so the TUM Live session cookie survives
+CHROME_PROFILE_DIR = ".chrome-profile"
+
+# More parallel downloads than this tend to get answered with 403s
+MAX_DOWNLOAD_WORKERS = 4
+# Parallel HLS fragment connections shared by all running downloads: a lone
+# download gets all 8, four running downloads get 2 each instead of 32 total
+MAX_CONNECTIONS = 8
+# Scraped videos allowed to wait for a free download worker
+MAX_QUEUED_DOWNLOADS = 2
+
+# Elements usually show up well within the default 0.5 s poll interval
+WAIT_POLL_FREQUENCY = 0.1
+
+# Transient failures worth retrying on the video page. Anything else, e.g. a
+# JavascriptException from _VIDEO_PAGE_JS or a dead Chrome session, is not
+# retried.
+SCRAPE_ERRORS = (
+    TimeoutException,
+    StaleElementReferenceException,
+    NoSuchElementException,
+    RuntimeError,
+)
+# Of those, the ones a retry on the already loaded page can fix. A timeout or
+# missing element means the page didn't render, so it gets reloaded instead.
+IN_PLACE_ERRORS = (
+    StaleElementReferenceException,
+    RuntimeError,
+)
+
+# Maps video page URL → downloaded file, so re-runs can skip without scraping
+MANIFEST_PATH = os.path.join("out", ".manifest.json")
+_manifest_lock = threading.Lock()
+
+_active_downloads = 0
+_active_downloads_lock = threading.Lock()
+
+_FN_BAD = re.compile(r'[\\/*?:"<>|]')
+_WS = re.compile(r'\s+')
+_YEAR = re.compile(r"/(20\d{2})(?:/|$)")
+
+_VIDEO_PAGE_JS = r"""
+const text = (el) => el ? el.innerText : "";
+const link = document.querySelector(".sm\\:flex-row > div:nth-child(1) > a:nth-child(1)");
+const source = document.querySelector("#video-comb_html5_api > source:nth-child(1)");
+return {
+    hls: source ? source.src : "",
+    href: link ? link.href : null,
+    span: text(link && link.querySelector("span.hover\\:text-1")),
+    h1: text(document.querySelector("h1.font-bold")),
+};
+"""
+
 def load_credentials(filepath: str = "credentials.json") -> tuple[str, str]:
-    with open(filepath, "r") as f:
-        data = json.load(f)
+    with open(filepath, "rb") as f:
+        data = orjson.loads(f.read())
     return data["username"], data["password"]
 
+_warmed_hosts: set[str] = set()
+# Set after the first failed stream API call, so the rest of the run goes
+# straight to the video page
+_stream_api_disabled = False
+
+def warm_dns(host: str | None):
+    # Resolve once up front so the first page load / segment fetch for a host
+    # doesn't pay for a cold DNS lookup
+    if not host or host in _warmed_hosts:
+        return
+    _warmed_hosts.add(host)
+    try:
+        socket.getaddrinfo(host, 443)
+    except socket.gaierror:
+        pass
+
+def build_chrome_options() -> webdriver.ChromeOptions:
+    # We only read a few DOM nodes, so skip rendering images, plugins and media
+    options = webdriver.ChromeOptions()
+    options.add_argument("--headless=new")
+    options.add_argument("--disable-gpu")
+    options.add_argument("--no-sandbox")
+    options.add_argument("--disable-dev-shm-usage")
+    options.add_argument("--blink-settings=imagesEnabled=false")
+    # The default headless UA contains "HeadlessChrome", which some servers reject
+    options.add_argument(f"--user-agent={USER_AGENT}")
+    options.add_argument(f"--user-data-dir={os.path.abspath(CHROME_PROFILE_DIR)}")
+    options.add_argument("--profile-directory=Default")
+    options.add_experimental_option("prefs", {
+        "profile.managed_default_content_settings.images": 2,
+        "profile.default_content_setting_values.plugins": 2,
+        "profile.default_content_setting_values.media_stream": 2,
+    })
+    # Return from driver.get() at DOMContentLoaded instead of the full load
+    options.page_load_strategy = "eager"
+    return options
+
 def wait_for_element(driver, by, selector, timeout: int = 20):
-    return WebDriverWait(driver, timeout).until(
+    return WebDriverWait(driver, timeout, poll_frequency=WAIT_POLL_FREQUENCY).until(
         EC.presence_of_element_located((by, selector))
     )
 
+# Folder names repeat for every video of a course
+@lru_cache(maxsize=1024)
 def sanitize_filename(name: str) -> str:
-    cleaned = re.sub(r'[\\/*?:"<>|]', '_', name)
-    return re.sub(r'\s+', ' ', cleaned).strip()
+    return _WS.sub(' ', _FN_BAD.sub('_', name)).strip()
 
 def extract_year_or_fallback(relative_path: str) -> str:
     # Extract a 4-digit year from the path (e.g. "/course/2021/S/ma0005").
     # If none found, return the entire relative path without leading slash.
-    m = re.search(r"/(20\d{2})(?:/|$)", relative_path)
+    m = _YEAR.search(relative_path)
     if m:
         return m.group(1)
     return relative_path.lstrip("/")
 
 def automated_login(driver, username: str, password: str):
     driver.get("https://live.rbg.tum.de")
+    # driver.get() returns at DOMContentLoaded, so wait until the user context
+    # shows either the login link or a logout link, then decide
+    wait_for_element(
+        driver, By.CSS_SELECTOR, "#user-context > a, #user-context a[href*='logout']"
+    )
+    if driver.find_elements(By.CSS_SELECTOR, "#user-context a[href*='logout']"):
+        print("✅ Already logged in")
+        return
     wait_for_element(driver, By.CSS_SELECTOR, "#user-context > a").click()
     wait_for_element(driver, By.CSS_SELECTOR, "#content > section > article > a").click()
     wait_for_element(driver, By.CSS_SELECTOR, "#username").send_keys(username)
@@ -41,134 +161,376 @@ def automated_login(driver, username: str, password: str):
     wait_for_element(driver, By.CSS_SELECTOR, "#user-context a[href*='logout']")
     print("✅ Logged in successfully")
 
-def get_pinned_courses(driver) -> list[tuple[str, str]]:
-    wait_for_element(driver, By.CSS_SELECTOR, "article.tum-live-side-navigation-group:nth-child(3) > a")
-    anchors = driver.find_elements(By.CSS_SELECTOR, "article.tum-live-side-navigation-group:nth-child(3) > a")
+def session_from_driver(driver) -> requests.Session:
+    # Reuse the logged-in browser cookies for plain HTTP requests
+    session = requests.Session()
+    session.headers["User-Agent"] = USER_AGENT
+    # Keep connections alive across listing pages and API calls
+    adapter = HTTPAdapter(pool_connections=16, pool_maxsize=32)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    for c in driver.get_cookies():
+        session.cookies.set(c["name"], c["value"], domain=c.get("domain"))
+    return session
+
+def fetch_html(session: requests.Session, url: str) -> LexborHTMLParser:
+    resp = session.get(url, timeout=20)
+    resp.raise_for_status()
+    return LexborHTMLParser(resp.text)
+
+def wait_for_all(driver, by, selector, timeout: int = 20):
+    return WebDriverWait(driver, timeout, poll_frequency=WAIT_POLL_FREQUENCY).until(
+        EC.presence_of_all_elements_located((by, selector))
+    )
+
+def get_listing_anchors(session: requests.Session, driver, url: str, selector: str) -> list[tuple[str, str]]:
+    # (href, text) of every anchor matching selector. The static HTML is
+    # enough normally; only render the page if it came back without them.
+    tree = fetch_html(session, url)
+    anchors = [(a.attributes.get("href") or "", a.text() or "") for a in tree.css(selector)]
+    if anchors or driver is None:
+        return anchors
+    driver.get(url)
+    wait_for_all(driver, By.CSS_SELECTOR, selector)
+    return [tuple(pair) for pair in driver.execute_script(
+        "return Array.from(document.querySelectorAll(arguments[0]))"
+        ".map(a => [a.getAttribute('href') || '', a.innerText || '']);",
+        selector,
+    )]
+
+def get_pinned_courses(session: requests.Session, driver=None) -> list[tuple[str, str]]:
+    anchors = get_listing_anchors(
+        session, driver, "https://live.rbg.tum.de",
+        "article.tum-live-side-navigation-group:nth-child(3) > a",
+    )
     courses = []
-    for a in anchors:
-        href = a.get_attribute("href")
+    for href, text in anchors:
         if not href:
             continue
         full_url = urljoin("https://live.rbg.tum.de", href)
-        name = re.sub(r'\s+', ' ', a.text or "").strip()
+        name = _WS.sub(' ', text).strip()
         courses.append((name, full_url))
     return courses
 
-def get_video_urls(driver, listing_page_url: str) -> list[str]:
-    driver.get(listing_page_url)
-    wait_for_element(driver, By.CSS_SELECTOR, "article.mb-8 a.block.mb-2")
-    anchors = driver.find_elements(By.CSS_SELECTOR, "article.mb-8 a.block.mb-2")
+def get_video_urls(session: requests.Session, listing_page_url: str, driver=None) -> list[str]:
+    anchors = get_listing_anchors(session, driver, listing_page_url, "article.mb-8 a.block.mb-2")
     urls = []
-    for a in anchors:
-        href = a.get_attribute("href")
+    for href, _ in anchors:
         if not href:
             continue
-        urls.append(urljoin("https://live.rbg.tum.de", href))
+        urls.append(urljoin(listing_page_url, href))
     return urls
 
-def extract_video_info(driver, video_page_url: str) -> tuple[str, str, str]:
-    driver.get(video_page_url)
+def fetch_stream_info(session: requests.Session, video_page_url: str) -> tuple[str, str]:
+    # Video pages look like /w/<course slug>/<stream id>; the stream API returns
+    # the HLS URL and lecture title without running the player JS
+    stream_id = urlparse(video_page_url).path.rstrip("/").rsplit("/", 1)[-1]
+    if not stream_id.isdigit():
+        raise ValueError(f"No stream ID in {video_page_url}")
+    resp = session.get(f"https://live.rbg.tum.de/api/stream/{stream_id}", timeout=20)
+    resp.raise_for_status()
+    data = resp.json()
+    if not isinstance(data, dict):
+        raise ValueError("Unexpected stream API response")
+
+    hls_url = data.get("playlistUrl")
+    h1_text = data.get("name")
+    if not isinstance(hls_url, str) or not hls_url.strip():
+        raise ValueError("HLS URL not found")
+    if not isinstance(h1_text, str) or not h1_text.strip():
+        raise ValueError("Lecture title not found")
+    return hls_url.strip(), h1_text
+
+def _ensure_on_page(driver, url: str, force: bool = False):
+    if force or driver.current_url != url:
+        driver.get(url)
+
+def _scrape_fields(driver, with_folder: bool = True) -> tuple[str, str, str, str]:
+    # Wait for the player to fill in its <source>, then read everything else
+    # in a single WebDriver round-trip
+    wait_for_element(driver, By.CSS_SELECTOR, "#video-comb_html5_api > source:nth-child(1)")
+    info = driver.execute_script(_VIDEO_PAGE_JS) or {}
 
     # HLS URL
-    source = wait_for_element(driver, By.CSS_SELECTOR, "#video-comb_html5_api > source:nth-child(1)")
-    hls_url = source.get_attribute("src") or ""
-    if not hls_url.strip():
+    hls_url = (info.get("hls") or "").strip()
+    if not hls_url:
         raise RuntimeError("HLS URL not found")
-    hls_url = hls_url.strip()
 
-    # Link element → full href → relative path → year or fallback
-    link = wait_for_element(driver, By.CSS_SELECTOR, ".sm\\:flex-row > div:nth-child(1) > a:nth-child(1)")
-    full_href = link.get_attribute("href") or ""
-    rel_path = urlparse(full_href).path
-    year_or_path = extract_year_or_fallback(rel_path)
+    span_text = ""
+    year_or_path = ""
+    if with_folder:
+        # Link element → full href → relative path → year or fallback
+        full_href = info.get("href")
+        if full_href is None:
+            raise RuntimeError("Course link not found")
+        rel_path = urlparse(full_href).path
+        year_or_path = extract_year_or_fallback(rel_path)
 
-    # span.hover:text-1 inner text
-    span = link.find_element(By.CSS_SELECTOR, "span.hover\\:text-1")
-    span_text = re.sub(r'\s+', ' ', span.text or "").strip()
+        # span.hover:text-1 inner text
+        span_text = info.get("span") or ""
+        if not span_text.strip():
+            raise RuntimeError("Course name not found")
 
     # h1.font-bold inner text
-    h1 = wait_for_element(driver, By.CSS_SELECTOR, "h1.font-bold")
-    h1_text = re.sub(r'\s+', ' ', h1.text or "").strip()
+    h1_text = info.get("h1") or ""
+    if not h1_text.strip():
+        raise RuntimeError("Lecture title not found")
+    return hls_url, span_text, year_or_path, h1_text
+
+def scrape_video_page(
+    driver, video_page_url: str, with_folder: bool = True, reload: bool = False
+) -> tuple[str, str, str, str]:
+    # Only navigates when the driver isn't already on the page (or a reload
+    # is asked for), so retrying after a stale element doesn't reload it
+    _ensure_on_page(driver, video_page_url, force=reload)
+    return _scrape_fields(driver, with_folder)
 
-    # Build folder (span + year_or_path) and file (h1_text)
-    folder_base = f"{span_text} - {year_or_path}"
-    safe_folder = sanitize_filename(folder_base)
+def extract_video_info(
+    driver,
+    session: requests.Session,
+    video_page_url: str,
+    course_url: str = "",
+    folder_cache: dict[str, str] | None = None,
+    reload: bool = False,
+) -> tuple[str, str, str]:
+    global _stream_api_disabled
+    # Every video of a course lands in the same folder, so the folder only
+    # has to be looked up once per course_url. It always comes from the video
+    # page, so all videos of a course end up in one folder.
+    cached_folder = folder_cache.get(course_url) if folder_cache is not None else None
+    api_result = None
+    if cached_folder is not None and not _stream_api_disabled:
+        try:
+            api_result = fetch_stream_info(session, video_page_url)
+        except (requests.RequestException, ValueError) as e:
+            _stream_api_disabled = True
+            print(f"ℹ️  Stream API unavailable ({e}), using the video pages from now on")
+
+    if api_result is not None:
+        hls_url, h1_text = api_result
+        span_text = year_or_path = ""
+    else:
+        hls_url, span_text, year_or_path, h1_text = scrape_video_page(
+            driver, video_page_url, with_folder=cached_folder is None, reload=reload
+        )
+
+    warm_dns(urlparse(hls_url).hostname)
+
+    h1_text = _WS.sub(' ', h1_text).strip()
     safe_file = sanitize_filename(h1_text)
 
+    if cached_folder is not None:
+        safe_folder = cached_folder
+    else:
+        # Build folder (span + year_or_path) and file (h1_text)
+        span_text = _WS.sub(' ', span_text).strip()
+        folder_base = f"{span_text} - {year_or_path}"
+        safe_folder = sanitize_filename(folder_base)
+        if folder_cache is not None:
+            folder_cache[course_url] = safe_folder
+
     print(f"📂 Folder: out/{safe_folder}")
     print(f"🎥 File: {safe_file}.mp4")
     return hls_url, safe_folder, safe_file
 
+def is_downloaded(path: str) -> bool:
+    # A single stat() instead of isfile() + getsize()
+    try:
+        st = os.stat(path)
+    except FileNotFoundError:
+        return False
+    return stat.S_ISREG(st.st_mode) and st.st_size > 1_000_000
+
+def load_manifest() -> dict[str, str]:
+    try:
+        with open(MANIFEST_PATH, "rb") as f:
+            return orjson.loads(f.read())
+    except (FileNotFoundError, orjson.JSONDecodeError):
+        return {}
+
+def save_manifest(manifest: dict[str, str]):
+    with _manifest_lock:
+        os.makedirs(os.path.dirname(MANIFEST_PATH), exist_ok=True)
+        with open(MANIFEST_PATH, "wb") as f:
+            f.write(orjson.dumps(manifest, option=orjson.OPT_INDENT_2))
+
+def record_download(manifest: dict[str, str], vid_url: str, out_path: str, save: bool = True):
+    # Called from the download threads; skips found while scraping are only
+    # saved once per course
+    with _manifest_lock:
+        manifest[vid_url] = out_path
+    if save:
+        save_manifest(manifest)
+
+def find_existing_download(manifest: dict[str, str], vid_url: str) -> str | None:
+    # Cheap check that doesn't need the video page. Files from before the
+    # manifest existed are found by their exact name after scraping instead
+    # of guessing from the counter, and recorded here for the next run.
+    known = manifest.get(vid_url)
+    if known and is_downloaded(known):
+        return known
+    return None
+
 def download_hls(hls_url: str, folder: str, file_name: str):
+    global _active_downloads
     out_dir = os.path.join("out", folder)
     os.makedirs(out_dir, exist_ok=True)
     out_path = os.path.join(out_dir, f"{file_name}.mp4")
 
+    # Split the connection budget between the downloads running right now
+    with _active_downloads_lock:
+        _active_downloads += 1
+        fragments = max(1, MAX_CONNECTIONS // _active_downloads)
+
     ydl_opts = {
         'outtmpl': out_path,
-        'format': 'best',
-        'quiet': False,
+        # No 'format': yt-dlp's default picks the best HLS variant and only
+        # asks for a separate audio merge when ffmpeg is available
+
+        # Parallel downloads would interleave their progress output
+        'quiet': True,
+        'noprogress': True,
         'nocheckcertificate': True,
+        # Fetch HLS fragments in parallel instead of one after another;
+        # needs the native HLS downloader rather than ffmpeg
+        'concurrent_fragment_downloads': fragments,
+        'hls_prefer_native': True,
+        'retries': 10,
+        'fragment_retries': 10,
+        'http_chunk_size': 10 * 1024 * 1024,
     }
-    with YoutubeDL(ydl_opts) as ydl:
-        ydl.download([hls_url])
+    if shutil.which("aria2c"):
+        # yt-dlp starts aria2c with -x16 -j16 -s16 regardless of
+        # concurrent_fragment_downloads; these args come later and win
+        ydl_opts['external_downloader'] = 'aria2c'
+        ydl_opts['external_downloader_args'] = {
+            'aria2c': ['-j', str(fragments), '-x', '1', '-s', '1'],
+        }
+    try:
+        with YoutubeDL(ydl_opts) as ydl:
+            ydl.download([hls_url])
+    finally:
+        with _active_downloads_lock:
+            _active_downloads -= 1
 
+    # yt-dlp leaves .f<id> parts behind instead when it couldn't merge them
+    if not os.path.isfile(out_path):
+        raise RuntimeError(f"yt-dlp did not produce {out_path} (is ffmpeg installed?)")
     print(f"✅ Download complete: {out_path}")
+    return out_path
+
+def write_error_file(folder: str, file_name: str, vid_url: str, exc: BaseException, attempts: int = 3):
+    out_dir = os.path.join("out", folder if folder else "out")
+    os.makedirs(out_dir, exist_ok=True)
+    error_file = os.path.join(out_dir, file_name)
+    with open(error_file, "w", encoding="utf-8") as f:
+        f.write(f"Download failed for {vid_url}\n\n")
+        f.write(str(exc) + "\n\n")
+        f.write("".join(traceback.format_exception(exc)))
+    print(f"❌ Download failed after {attempts} attempt{'s' if attempts != 1 else ''}: {error_file}")
+
+def download_worker(manifest: dict[str, str], vid_url: str, hls_url: str, folder: str, file_name: str):
+    # Runs in a pool thread; download_hls builds its own YoutubeDL instance
+    last_exception = None
+    for attempt in range(1, 4):
+        try:
+            out_path = download_hls(hls_url, folder, file_name)
+            record_download(manifest, vid_url, out_path)
+            return
+        except Exception as e:
+            last_exception = e
+            print(f"⚠️  Download attempt {attempt} failed for {vid_url}: {e}")
+            if attempt < 3:
+                time.sleep(min(2 ** (attempt - 1), 30))
+    write_error_file(folder, file_name, vid_url, last_exception)
 
 def main():
     overwrite = "--overwrite" in sys.argv
     username, password = load_credentials()
-    driver = webdriver.Chrome()
+    warm_dns("live.rbg.tum.de")
+    driver = webdriver.Chrome(options=build_chrome_options())
     try:
         automated_login(driver, username, password)
+        session = session_from_driver(driver)
 
         # 1) Get pinned courses
-        pinned = get_pinned_courses(driver)
+        pinned = get_pinned_courses(session, driver)
         print("🔔 Pinned courses:")
         for name, url in pinned:
             print(f"  • {name} → {url}")
 
-        # 2) For each course, grab its video URLs and download
-        for course_name, course_url in pinned:
-            print(f"\n▶ Processing course: {course_name}")
-            video_urls = get_video_urls(driver, course_url)
-            n_videos = len(video_urls)
-            for idx, vid_url in enumerate(video_urls):
-                # Reverse counter: newest gets highest, oldest gets 01
-                counter = n_videos - idx
-                print(f"   → Video page: {vid_url}")
-                folder = "unknown"
-                file_name = "unknown"
-                last_exception = None
-                for attempt in range(1, 4):
-                    try:
-                        hls_url, folder, file_name = extract_video_info(driver, vid_url)
+        folder_cache: dict[str, str] = {}
+        manifest = load_manifest()
+
+        # 2) For each course, scrape its videos with the (single-threaded) driver
+        #    and hand them to the download pool right away, so scraping the next
+        #    video overlaps with downloading the previous ones
+        with ThreadPoolExecutor(max_workers=MAX_DOWNLOAD_WORKERS) as pool:
+            # Don't let scraping run more than a few videos ahead of the downloads
+            slots = threading.BoundedSemaphore(MAX_DOWNLOAD_WORKERS + MAX_QUEUED_DOWNLOADS)
+            futures = []
+            try:
+                for course_name, course_url in pinned:
+                    print(f"\n▶ Processing course: {course_name}")
+                    video_urls = get_video_urls(session, course_url, driver)
+                    n_videos = len(video_urls)
+                    for idx, vid_url in enumerate(video_urls):
+                        # Reverse counter: newest gets highest, oldest gets 01
+                        counter = n_videos - idx
+                        print(f"   → Video page: {vid_url}")
+                        if not overwrite:
+                            existing = find_existing_download(manifest, vid_url)
+                            if existing:
+                                print(f"⏩ Skipping (already downloaded): {existing}")
+                                continue
+                        folder = "unknown"
+                        file_name = "unknown"
+                        last_exception = None
+                        reload = False
+                        for attempt in range(1, 4):
+                            try:
+                                hls_url, folder, file_name = extract_video_info(
+                                    driver, session, vid_url, course_url, folder_cache, reload
+                                )
+                                last_exception = None
+                                break
+                            except SCRAPE_ERRORS as e:
+                                last_exception = e
+                                reload = not isinstance(e, IN_PLACE_ERRORS)
+                                print(f"⚠️  Attempt {attempt} failed for {vid_url}: {e}")
+                                if attempt < 3:
+                                    time.sleep(min(2 ** (attempt - 1), 30))
+                            except Exception as e:
+                                # Not a scraping hiccup; record it and move on without retrying
+                                last_exception = e
+                                print(f"⚠️  Unexpected error for {vid_url}: {e!r}")
+                                break
+                        if last_exception is not None:
+                            write_error_file(
+                                folder, f"{counter:02d} {file_name}", vid_url, last_exception, attempt
+                            )
+                            continue
+
                         counter_str = f"{counter:02d} "
                         file_name_with_counter = counter_str + file_name
                         out_dir = os.path.join("out", folder)
                         out_path = os.path.join(out_dir, f"{file_name_with_counter}.mp4")
-                        if not overwrite and os.path.isfile(out_path) and os.path.getsize(out_path) > 1_000_000:
+                        if not overwrite and is_downloaded(out_path):
+                            record_download(manifest, vid_url, out_path, save=False)
                             print(f"⏩ Skipping (already exists and is not empty): {out_path}")
-                            break
-                        download_hls(hls_url, folder, file_name_with_counter)
-                        last_exception = None
-                        break
-                    except Exception as e:
-                        last_exception = e
-                        print(f"⚠️  Attempt {attempt} failed for {vid_url}: {e}")
-                        if attempt < 3:
-                            import time
-                            time.sleep(2)
-                if last_exception is not None:
-                    import traceback
-                    out_dir = os.path.join("out", folder if folder else "out")
-                    os.makedirs(out_dir, exist_ok=True)
-                    error_file = os.path.join(out_dir, f"{counter:02d} {file_name}")
-                    with open(error_file, "w", encoding="utf-8") as f:
-                        f.write(f"Download failed for {vid_url}\n\n")
-                        f.write(str(last_exception) + "\n\n")
-                        f.write(traceback.format_exc())
-                    print(f"❌ Download failed after 3 attempts: {error_file}")
+                            continue
+                        slots.acquire()
+                        future = pool.submit(download_worker, manifest, vid_url, hls_url, folder, file_name_with_counter)
+                        future.add_done_callback(lambda _: slots.release())
+                        futures.append(future)
+                    save_manifest(manifest)
+
+                for future in futures:
+                    future.result()
+            except BaseException:
+                # Let running downloads finish, but don't start the queued ones
+                pool.shutdown(wait=True, cancel_futures=True)
+                raise
 
     finally:
         driver.quit()